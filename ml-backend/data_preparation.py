@@ -13,18 +13,392 @@ Prepares data for ML model training
 
 import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from typing import Dict, Tuple, List
+from sklearn.preprocessing import StandardScaler
+from typing import Dict, Tuple, List, Iterable, Any, Union
 import json
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numexpr as ne
+except ImportError:  # Optional: falls back to plain NumPy expressions
+    ne = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: kernels run as plain Python / NumPy
+    njit = None
+    prange = range
+
+
+# Structure-of-arrays dataset: column name -> 1-D array
+Columns = Dict[str, np.ndarray]
+
+# pandas < 3 copies on concat unless told not to; pandas 3 (Copy-on-Write)
+# never copies eagerly and deprecates the flag
+_CONCAT_NO_COPY = {'copy': False} if int(pd.__version__.split('.')[0]) < 3 else {}
+
+# Upper (inclusive) edges of the first three age groups
+_AGE_GROUP_EDGES = np.array([40, 50, 60], dtype=np.float32)
+
+# Source columns read by engineer_features
+_ENGINEER_INPUTS = ('age', 'chol', 'trestbps', 'thalach', 'hdl', 'sex')
+
+# Rows per engineer_features tile (~1MB of inputs, fits in L2)
+_FEATURE_TILE_ROWS = 32768
+
+# Synthetic dataset columns and dtypes, in output order
+_SYNTHETIC_SCHEMA = (
+    ('age', np.float32), ('sex', np.int8), ('cp', np.int8),
+    ('trestbps', np.float32), ('chol', np.float32), ('fbs', np.int8),
+    ('restecg', np.int8), ('thalach', np.float32), ('exang', np.int8),
+    ('oldpeak', np.float32), ('slope', np.int8), ('ca', np.int8),
+    ('thal', np.int8), ('target', np.int8),
+)
+
+# (name, mean, std, min, max) of the clipped normal features
+_NORMAL_FEATURES = (
+    ('age', 54, 9, 29, 77),
+    ('trestbps', 131, 17, 94, 200),
+    ('chol', 246, 51, 126, 564),
+    ('thalach', 150, 22, 71, 202),
+)
+
+# (name, P(1)) of the binary features
+_BINARY_FEATURES = (
+    ('sex', 0.68),  # 68% male
+    ('fbs', 0.15),
+    ('exang', 0.33),
+)
+
+# (name, class probabilities) of the categorical features
+_CATEGORICAL_FEATURES = (
+    ('cp', [0.47, 0.16, 0.29, 0.08]),
+    ('restecg', [0.50, 0.48, 0.02]),
+    ('slope', [0.21, 0.49, 0.30]),
+    ('ca', [0.59, 0.21, 0.12, 0.06, 0.02]),
+    ('thal', [0.02, 0.18, 0.55, 0.25]),
+)
+
+# Rows per independently seeded generate_synthetic_data tile
+_SYNTHETIC_TILE_ROWS = 16384
+
+def _column_dtype(value: Any) -> np.dtype:
+    """Infer the NumPy column dtype for a scalar JSON value"""
+    if isinstance(value, bool):
+        return np.dtype(np.bool_)
+    if isinstance(value, int):
+        return np.dtype(np.int64)
+    if isinstance(value, float):
+        return np.dtype(np.float64)
+    return np.dtype(object)
+
+
+def _fits(dtype: np.dtype, value: Any) -> bool:
+    """Check whether a scalar can be stored in a column without widening"""
+    if dtype.kind == 'O':
+        return True
+    if dtype.kind == 'b':
+        return isinstance(value, bool)
+    if dtype.kind in 'iu':
+        return isinstance(value, int)
+    return isinstance(value, (int, float))
+
+
+def _jit(**options):
+    """numba.njit(**options) when numba is installed, else leave the function as plain Python"""
+    return njit(**options) if njit is not None else (lambda fn: fn)
+
+
+@_jit(parallel=True, fastmath=True, cache=True)
+def _risk_target_kernel(age, sex, cp, trestbps, chol, fbs, thalach,
+                        exang, oldpeak, ca, thal, noise, target):
+    """
+    Synthetic target model: weighted sum of risk-factor indicators plus
+    noise, thresholded at 0.5 and written into target
+    """
+    for i in prange(age.size):
+        s = (
+            (age[i] - 29.0) / 48.0 * 0.15  # Age contribution
+            + sex[i] * 0.10  # Sex contribution
+            + fbs[i] * 0.05  # High fasting blood sugar
+            + exang[i] * 0.15  # Exercise induced angina
+        )
+        if cp[i] == 0:  # Asymptomatic chest pain high risk
+            s += 0.20
+        if trestbps[i] > 140:  # High BP
+            s += 0.15
+        if chol[i] > 240:  # High cholesterol
+            s += 0.10
+        if thalach[i] < 120:  # Low max heart rate
+            s += 0.15
+        if oldpeak[i] > 2:  # ST depression
+            s += 0.15
+        if ca[i] > 0:  # Fluoroscopy vessels
+            s += 0.10
+        if thal[i] == 2:  # Reversible defect
+            s += 0.15
+        target[i] = 1 if s + noise[i] > 0.5 else 0
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _engineer_kernel(age, chol, trestbps, thalach,
+                         age_group, chol_risk, bp_risk, hr_reserve):
+        """Fused per-row age_group / chol_risk / bp_risk / hr_reserve"""
+        for i in prange(age.size):
+            a = age[i]
+            age_group[i] = (a > 40) + (a > 50) + (a > 60)
+            chol_risk[i] = chol[i] > 240
+            bp_risk[i] = trestbps[i] > 140
+            hr_reserve[i] = min(max(thalach[i] / (220.0 - a), 0.0), 1.0)
+
+
+def _inverse_cdf(probs: List[float], u: np.ndarray) -> np.ndarray:
+    """Map uniform draws in [0, 1) to category indices 0..len(probs)-1 (int8)"""
+    cdf = np.cumsum(probs)
+    cdf[-1] = 1.0  # Guard against rounding leaving the last bin short
+    return np.searchsorted(cdf, u, side='right').astype(np.int8)
+
+
+def _engineer_tile(src: Dict[str, np.ndarray], out: Dict[str, np.ndarray]):
+    """
+    Compute every engineered feature for one row tile
+    
+    Args:
+        src: Source column views for the tile (age, chol, trestbps, ...)
+        out: Preallocated output column views for the same rows
+    """
+    age, chol, trestbps = src['age'], src['chol'], src['trestbps']
+    
+    if njit is not None and 'hr_reserve' in out:
+        # One pass over age/chol/trestbps/thalach for the first four features
+        _engineer_kernel(age, chol, trestbps, src['thalach'], out['age_group'],
+                         out['chol_risk'], out['bp_risk'], out['hr_reserve'])
+    else:
+        # Age groups: (..40] -> 0, (40, 50] -> 1, (50, 60] -> 2, (60..) -> 3
+        out['age_group'][:] = np.searchsorted(_AGE_GROUP_EDGES, age)
+        
+        # Cholesterol risk
+        np.greater(chol, 240, out=out['chol_risk'])
+        
+        # Blood pressure risk
+        np.greater(trestbps, 140, out=out['bp_risk'])
+        
+        # Heart rate reserve (if max HR available)
+        if 'hr_reserve' in out:
+            predicted_max_hr = 220 - age
+            out['hr_reserve'][:] = np.clip(src['thalach'] / predicted_max_hr, 0, 1)
+    
+    # Cholesterol/HDL ratio (if HDL available)
+    if 'chol_hdl_ratio' in out:
+        out['chol_hdl_ratio'][:] = np.clip(chol / src['hdl'], 0, 10)
+    
+    # Risk score composite
+    out['composite_risk'][:] = (
+        (age / 100) * 0.3 +
+        (trestbps / 200) * 0.3 +
+        (chol / 300) * 0.4
+    )
+    
+    # Interaction features
+    if 'sex_age_interaction' in out:
+        np.multiply(src['sex'], age, out=out['sex_age_interaction'])
+
+
+def _fill_synthetic_tile(rng: np.random.Generator, out: Columns, noise: np.ndarray):
+    """
+    Draw one row tile of the synthetic feature columns in place
+    
+    Args:
+        rng: Generator for this tile
+        out: Feature column views for the tile's rows (target is not touched)
+        noise: Target noise view for the same rows
+    """
+    # Continuous features (float32): normal draws shifted, scaled, clipped
+    for name, mean, std, low, high in _NORMAL_FEATURES:
+        col = out[name]
+        rng.standard_normal(dtype=np.float32, out=col)
+        col *= std
+        col += mean
+        np.clip(col, low, high, out=col)
+    
+    rng.standard_normal(dtype=np.float32, out=noise)
+    noise *= 0.1
+    
+    # Binary features (int8) by thresholding, categorical features (int8)
+    # by inverse-CDF lookup, both from a reused uniform buffer
+    u = np.empty(len(noise), dtype=np.float32)
+    for name, p in _BINARY_FEATURES:
+        rng.random(dtype=np.float32, out=u)
+        np.less(u, p, out=out[name])
+    for name, probs in _CATEGORICAL_FEATURES:
+        rng.random(dtype=np.float32, out=u)
+        out[name][:] = _inverse_cdf(probs, u)
+    
+    oldpeak = out['oldpeak']
+    rng.standard_exponential(dtype=np.float32, out=oldpeak)
+    np.clip(oldpeak, 0, 6.2, out=oldpeak)
+
+
+def _stratified_split_indices(y: np.ndarray, test_size: float, val_size: float,
+                              rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split row indices into train/val/test, preserving class proportions
+    
+    Each class's indices are permuted once and sliced; the per-split
+    index arrays are then shuffled so classes are interleaved.
+    
+    Args:
+        y: Class labels
+        test_size: Proportion of each class for the test split
+        val_size: Proportion of each class for the validation split
+        rng: Random generator
+        
+    Returns:
+        Tuple of (train_idx, val_idx, test_idx)
+    """
+    train_parts, val_parts, test_parts = [], [], []
+    for cls in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == cls))
+        n_test = int(round(len(idx) * test_size))
+        n_val = int(round(len(idx) * val_size))
+        test_parts.append(idx[:n_test])
+        val_parts.append(idx[n_test:n_test + n_val])
+        train_parts.append(idx[n_test + n_val:])
+    
+    return tuple(rng.permutation(np.concatenate(parts))
+                 for parts in (train_parts, val_parts, test_parts))
+
+
+def _records_to_columns(records: Iterable[Dict[str, Any]],
+                        initial_capacity: int = 1024) -> Dict[str, np.ndarray]:
+    """
+    Write a stream of flat records into preallocated per-column arrays
+
+    Column dtypes are inferred from the first value seen for each key; a
+    column is widened to float64 (or object) when a later value does not fit,
+    and missing values become NaN/None. Storage grows geometrically so the
+    stream is consumed in a single pass.
+
+    Args:
+        records: Iterable of flat dicts (one per row)
+        initial_capacity: Starting row capacity of each column buffer
+
+    Returns:
+        Dict mapping column name to a 1-D array trimmed to the row count
+    """
+    columns: Dict[str, np.ndarray] = {}
+    capacity = initial_capacity
+    n = 0
+
+    def widen(key: str, numeric: bool) -> np.ndarray:
+        arr = columns[key]
+        arr = arr.astype(np.float64 if numeric and arr.dtype.kind != 'O' else object)
+        columns[key] = arr
+        return arr
+
+    def set_missing(key: str):
+        arr = columns[key]
+        if arr.dtype.kind in 'biu':
+            arr = widen(key, numeric=True)
+        arr[n] = None if arr.dtype.kind == 'O' else np.nan
+
+    for record in records:
+        if n == capacity:
+            capacity *= 2
+            for key, arr in columns.items():
+                grown = np.empty(capacity, dtype=arr.dtype)
+                grown[:n] = arr[:n]
+                columns[key] = grown
+
+        for key, value in record.items():
+            arr = columns.get(key)
+            if arr is None:
+                if n == 0 and value is not None:
+                    dtype = _column_dtype(value)
+                elif value is None or isinstance(value, (int, float)):
+                    dtype = np.dtype(np.float64)
+                else:
+                    dtype = np.dtype(object)
+                arr = np.empty(capacity, dtype=dtype)
+                if n:
+                    # Column first seen mid-stream: earlier rows are missing
+                    arr[:n] = None if dtype.kind == 'O' else np.nan
+                columns[key] = arr
+
+            if value is None:
+                set_missing(key)
+                continue
+            if not _fits(arr.dtype, value):
+                arr = widen(key, numeric=isinstance(value, (int, float)))
+            arr[n] = value
+
+        if len(record) < len(columns):
+            for key in list(columns):
+                if key not in record:
+                    set_missing(key)
+
+        n += 1
+
+    return {key: arr[:n] for key, arr in columns.items()}
+
+
+def load_prepared_data(filepath: str) -> Dict[str, np.ndarray]:
+    """
+    Load the train/val/test splits written by save_prepared_data
+    
+    np.load ignores mmap_mode for .npz archives, so arrays stored
+    uncompressed are memory-mapped here directly from their offset inside
+    the zip; pages are read on demand instead of materialized up front.
+    Compressed members (older files) are read normally.
+    
+    Args:
+        filepath: Path to prepared_data.npz
+        
+    Returns:
+        Dict of array name -> read-only np.memmap (or ndarray)
+    """
+    import zipfile
+    import struct
+    
+    arrays = {}
+    with zipfile.ZipFile(filepath) as archive, open(filepath, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            # Local file header: 30 fixed bytes + file name + extra field
+            f.seek(info.header_offset)
+            name_len, extra_len = struct.unpack('<HH', f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            read_header = {(1, 0): np.lib.format.read_array_header_1_0,
+                           (2, 0): np.lib.format.read_array_header_2_0}.get(version)
+            shape, fortran_order, dtype = read_header(f) if read_header else ((), False, np.dtype(object))
+            if dtype.hasobject or np.prod(shape) == 0:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            arrays[name] = np.memmap(filepath, dtype=dtype, mode='r', offset=f.tell(),
+                                     shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
 
 class DataPreparationService:
     """
     Prepares cardiac risk prediction data for ML training
     """
     
-    def __init__(self):
+    def __init__(self, verbose: bool = False):
+        """
+        Args:
+            verbose: Print progress and summary lines (off for library use)
+        """
+        self.verbose = verbose
         self.scaler = StandardScaler()
         self.label_encoders = {}
         self.feature_names = []
@@ -40,89 +414,125 @@ class DataPreparationService:
         Returns:
             DataFrame with all records
         """
-        print(f"📂 Loading data from {json_path}...")
+        if self.verbose:
+            print(f"📂 Loading data from {json_path}...")
+        
+        try:
+            import ijson
+        except ImportError:
+            ijson = None
+        
+        if ijson is None or os.path.getsize(json_path) == 0:
+            with open(json_path, 'r') as f:
+                data = json.load(f)
+            df = pd.DataFrame(data)
+        else:
+            # Stream records straight from the mapped file into column arrays
+            # instead of materializing the whole list of dicts first
+            with open(json_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                columns = _records_to_columns(ijson.items(mm, 'item', use_float=True))
+            df = pd.DataFrame(columns, copy=False)
+        
+        if self.verbose:
+            print(f"✅ Loaded {len(df)} records")
+            print(f"   Columns: {df.shape[1]}")
+            print(f"   Features: {list(df.columns)[:10]}...")
+        
+        return df
+    
+    def load_data_from_parquet(self, parquet_path: str,
+                               columns: List[str] = None) -> pd.DataFrame:
+        """
+        Load data from a Parquet file through a memory map
+        
+        Only the requested columns are read, and Arrow buffers are handed
+        to pandas column by column without consolidating into blocks.
+        
+        Args:
+            parquet_path: Path to Parquet file with dataset
+            columns: Optional subset of columns to read (default: all)
+            
+        Returns:
+            DataFrame with all records
+        """
+        import pyarrow.parquet as pq
+        if self.verbose:
+            print(f"📂 Loading data from {parquet_path}...")
         
-        with open(json_path, 'r') as f:
-            data = json.load(f)
+        table = pq.read_table(parquet_path, columns=columns, memory_map=True)
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        del table
         
-        df = pd.DataFrame(data)
-        print(f"✅ Loaded {len(df)} records")
-        print(f"   Columns: {df.shape[1]}")
-        print(f"   Features: {list(df.columns)[:10]}...")
+        if self.verbose:
+            print(f"✅ Loaded {len(df)} records")
+            print(f"   Columns: {df.shape[1]}")
         
         return df
     
-    def generate_synthetic_data(self, n_samples: int = 80000) -> pd.DataFrame:
+    def save_data_to_parquet(self, df: Union[pd.DataFrame, Columns], parquet_path: str):
+        """Save a dataset (DataFrame or column dict) as Parquet for fast columnar reloads"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if isinstance(df, pd.DataFrame):
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        else:
+            table = pa.table(df)
+        pq.write_table(table, parquet_path)
+        if self.verbose:
+            print(f"✅ Saved {table.num_rows} records to {parquet_path}")
+    
+    def generate_synthetic_data(self, n_samples: int = 80000,
+                                as_frame: bool = True) -> Union[pd.DataFrame, Columns]:
         """
         Generate synthetic cardiac risk data for training
         (Used if JSON export not available)
         
         Args:
             n_samples: Number of samples to generate
+            as_frame: If False, return the column arrays as a dict instead
+                of wrapping them in a DataFrame
             
         Returns:
-            DataFrame with synthetic data
+            DataFrame (or column dict) with synthetic data
         """
-        print(f"🔧 Generating {n_samples} synthetic records...")
-        
-        np.random.seed(42)
-        
-        # Generate base features
-        age = np.random.normal(54, 9, n_samples).clip(29, 77)
-        sex = np.random.binomial(1, 0.68, n_samples)  # 68% male
-        cp = np.random.choice([0, 1, 2, 3], n_samples, p=[0.47, 0.16, 0.29, 0.08])
-        trestbps = np.random.normal(131, 17, n_samples).clip(94, 200)
-        chol = np.random.normal(246, 51, n_samples).clip(126, 564)
-        fbs = np.random.binomial(1, 0.15, n_samples)
-        restecg = np.random.choice([0, 1, 2], n_samples, p=[0.50, 0.48, 0.02])
-        thalach = np.random.normal(150, 22, n_samples).clip(71, 202)
-        exang = np.random.binomial(1, 0.33, n_samples)
-        oldpeak = np.random.exponential(1.0, n_samples).clip(0, 6.2)
-        slope = np.random.choice([0, 1, 2], n_samples, p=[0.21, 0.49, 0.30])
-        ca = np.random.choice([0, 1, 2, 3, 4], n_samples, p=[0.59, 0.21, 0.12, 0.06, 0.02])
-        thal = np.random.choice([0, 1, 2, 3], n_samples, p=[0.02, 0.18, 0.55, 0.25])
-        
-        # Generate target based on risk factors
-        risk_score = (
-            (age - 29) / 48 * 0.15 +  # Age contribution
-            sex * 0.10 +  # Sex contribution
-            (cp == 0) * 0.20 +  # Asymptomatic chest pain high risk
-            (trestbps > 140) * 0.15 +  # High BP
-            (chol > 240) * 0.10 +  # High cholesterol
-            fbs * 0.05 +  # High fasting blood sugar
-            (thalach < 120) * 0.15 +  # Low max heart rate
-            exang * 0.15 +  # Exercise induced angina
-            (oldpeak > 2) * 0.15 +  # ST depression
-            (ca > 0) * 0.10 +  # Fluoroscopy vessels
-            (thal == 2) * 0.15  # Reversible defect
-        )
-        
-        # Add noise and convert to binary target
-        risk_score += np.random.normal(0, 0.1, n_samples)
-        target = (risk_score > 0.5).astype(int)
-        
-        # Create DataFrame
-        df = pd.DataFrame({
-            'age': age,
-            'sex': sex,
-            'cp': cp,
-            'trestbps': trestbps,
-            'chol': chol,
-            'fbs': fbs,
-            'restecg': restecg,
-            'thalach': thalach,
-            'exang': exang,
-            'oldpeak': oldpeak,
-            'slope': slope,
-            'ca': ca,
-            'thal': thal,
-            'target': target
-        })
-        
-        print(f"✅ Generated {len(df)} records")
-        print(f"   Target distribution: {target.mean():.1%} high risk")
-        
-        return df
+        if self.verbose:
+            print(f"🔧 Generating {n_samples} synthetic records...")
+        
+        # Output columns are preallocated; fixed-size row tiles are filled
+        # in parallel, each from its own child seed, so the result does not
+        # depend on the number of workers
+        columns = {name: np.empty(n_samples, dtype=dtype)
+                   for name, dtype in _SYNTHETIC_SCHEMA}
+        noise = np.empty(n_samples, dtype=np.float32)
+        n_tiles = max(1, -(-n_samples // _SYNTHETIC_TILE_ROWS))
+        seeds = np.random.SeedSequence(42).spawn(n_tiles)
+        
+        def fill_tile(t: int):
+            rows = slice(t * _SYNTHETIC_TILE_ROWS, (t + 1) * _SYNTHETIC_TILE_ROWS)
+            _fill_synthetic_tile(np.random.default_rng(seeds[t]),
+                                 {name: arr[rows] for name, arr in columns.items()},
+                                 noise[rows])
+        
+        with ThreadPoolExecutor(max_workers=min(n_tiles, os.cpu_count() or 1)) as pool:
+            list(pool.map(fill_tile, range(n_tiles)))
+        
+        age, sex, cp = columns['age'], columns['sex'], columns['cp']
+        trestbps, chol, fbs = columns['trestbps'], columns['chol'], columns['fbs']
+        thalach, exang, oldpeak = columns['thalach'], columns['exang'], columns['oldpeak']
+        ca, thal, target = columns['ca'], columns['thal'], columns['target']
+        
+        # Generate target based on risk factors (with noise)
+        _risk_target_kernel(age, sex, cp, trestbps, chol, fbs, thalach,
+                            exang, oldpeak, ca, thal, noise, target)
+        
+        if self.verbose:
+            print(f"✅ Generated {n_samples} records")
+            print(f"   Target distribution: {target.mean():.1%} high risk")
+        
+        if not as_frame:
+            return columns
+        return pd.DataFrame(columns, copy=False)
     
     def engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -134,48 +544,58 @@ class DataPreparationService:
         Returns:
             DataFrame with engineered features
         """
-        print("🔧 Engineering features...")
-        
-        df_features = df.copy()
-        
-        # Age groups
-        df_features['age_group'] = pd.cut(df['age'], 
-                                          bins=[0, 40, 50, 60, 100],
-                                          labels=[0, 1, 2, 3])
-        
-        # Cholesterol risk
-        df_features['chol_risk'] = (df['chol'] > 240).astype(int)
-        
-        # Blood pressure risk
-        df_features['bp_risk'] = (df['trestbps'] > 140).astype(int)
-        
-        # Heart rate reserve (if max HR available)
-        if 'thalach' in df.columns:
-            predicted_max_hr = 220 - df['age']
-            df_features['hr_reserve'] = (df['thalach'] / predicted_max_hr).clip(0, 1)
-        
-        # Cholesterol/HDL ratio (if HDL available)
-        if 'hdl' in df.columns:
-            df_features['chol_hdl_ratio'] = (df['chol'] / df['hdl']).clip(0, 10)
-        
-        # Risk score composite
-        if all(col in df.columns for col in ['age', 'trestbps', 'chol']):
-            df_features['composite_risk'] = (
-                (df['age'] / 100) * 0.3 +
-                (df['trestbps'] / 200) * 0.3 +
-                (df['chol'] / 300) * 0.4
-            )
-        
-        # Interaction features
-        if 'sex' in df.columns and 'age' in df.columns:
-            df_features['sex_age_interaction'] = df['sex'] * df['age']
+        new_cols = self._engineered_columns(df)
+        return pd.concat([df, pd.DataFrame(new_cols, index=df.index)],
+                         axis=1, **_CONCAT_NO_COPY)
+    
+    def _engineered_columns(self, df: Union[pd.DataFrame, Columns]) -> Columns:
+        """
+        Compute the engineered features as standalone arrays
         
-        print(f"✅ Engineered {df_features.shape[1] - df.shape[1]} new features")
+        The input is only read, never copied; callers that need a
+        matrix (prepare_data) use the arrays directly.
         
-        return df_features
+        Args:
+            df: Raw DataFrame or column dict
+            
+        Returns:
+            Dict mapping new feature name to a 1-D array (in output order)
+        """
+        if self.verbose:
+            print("🔧 Engineering features...")
+        
+        # NumPy views of the source columns; output columns are preallocated
+        # and filled tile by tile so each tile's inputs stay cache-resident
+        # across all engineered features
+        src = {col: np.asarray(df[col]) for col in _ENGINEER_INPUTS if col in df}
+        n_rows = len(src['age'])
+        float_dtype = np.result_type(np.float32, *src.values())
+        
+        new_cols = {
+            'age_group': np.empty(n_rows, dtype=np.int8),
+            'chol_risk': np.empty(n_rows, dtype=np.int8),
+            'bp_risk': np.empty(n_rows, dtype=np.int8),
+        }
+        if 'thalach' in src:
+            new_cols['hr_reserve'] = np.empty(n_rows, dtype=float_dtype)
+        if 'hdl' in src:
+            new_cols['chol_hdl_ratio'] = np.empty(n_rows, dtype=float_dtype)
+        new_cols['composite_risk'] = np.empty(n_rows, dtype=float_dtype)
+        if 'sex' in src:
+            new_cols['sex_age_interaction'] = np.empty(n_rows, dtype=float_dtype)
+        
+        for start in range(0, n_rows, _FEATURE_TILE_ROWS):
+            tile = slice(start, start + _FEATURE_TILE_ROWS)
+            _engineer_tile({col: arr[tile] for col, arr in src.items()},
+                           {col: arr[tile] for col, arr in new_cols.items()})
+        
+        if self.verbose:
+            print(f"✅ Engineered {len(new_cols)} new features")
+        
+        return new_cols
     
     def prepare_data(self, 
-                    df: pd.DataFrame,
+                    df: Union[pd.DataFrame, Columns],
                     test_size: float = 0.15,
                     val_size: float = 0.15,
                     random_state: int = 42) -> Tuple[np.ndarray, np.ndarray, np.ndarray, 
@@ -184,7 +604,8 @@ class DataPreparationService:
         Prepare data for training: split, scale, encode
         
         Args:
-            df: Input DataFrame
+            df: Input DataFrame, or column dict from
+                generate_synthetic_data(as_frame=False)
             test_size: Proportion for test set
             val_size: Proportion for validation set
             random_state: Random seed
@@ -192,63 +613,131 @@ class DataPreparationService:
         Returns:
             Tuple of (X_train, X_val, X_test, y_train, y_val, y_test)
         """
-        print("🔧 Preparing data for training...")
-        
-        # Engineer features
-        df = self.engineer_features(df)
+        if self.verbose:
+            print("🔧 Preparing data for training...")
         
         # Separate features and target
-        if 'target' in df.columns:
-            y = df['target'].values
-            X = df.drop('target', axis=1)
-        elif 'diagnosis' in df.columns:
-            y = df['diagnosis'].values
-            X = df.drop('diagnosis', axis=1)
+        if 'target' in df:
+            target_col = 'target'
+            y = np.asarray(df['target'], dtype=np.int8)
+        elif 'diagnosis' in df:
+            target_col = 'diagnosis'
+            y = np.asarray(df['diagnosis'])
         else:
             raise ValueError("No target column found (expected 'target' or 'diagnosis')")
         
-        # Handle categorical features
-        categorical_cols = X.select_dtypes(include=['object', 'category']).columns
+        # Raw feature columns (NumPy views) followed by the engineered ones;
+        # the input frame is never copied or concatenated
+        columns = {col: np.asarray(df[col]) for col in df if col != target_col}
+        
+        # Handle categorical features: the known schema is all numeric
+        # (age_group is already int8), so only non-numeric columns from
+        # external data are encoded, found from the views taken above
+        categorical_cols = [col for col, arr in columns.items()
+                            if arr.dtype.kind not in 'biuf']
         for col in categorical_cols:
+            # Integer codes straight from pd.Categorical; the fitted categories
+            # are kept so later calls encode with the same mapping
             if col not in self.label_encoders:
-                self.label_encoders[col] = LabelEncoder()
-                X[col] = self.label_encoders[col].fit_transform(X[col].astype(str))
+                cat = pd.Categorical(df[col])
+                self.label_encoders[col] = cat.categories
             else:
-                X[col] = self.label_encoders[col].transform(X[col].astype(str))
-        
-        # Store feature names
-        self.feature_names = list(X.columns)
+                cat = pd.Categorical(df[col], categories=self.label_encoders[col])
+            columns[col] = cat.codes
         
-        # Convert to numpy
-        X = X.values
+        # Engineer features
+        columns.update(self._engineered_columns(df))
         
-        # Split: first train+val, then split val from train
-        X_temp, X_test, y_temp, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=random_state, stratify=y
+        # Store feature names
+        self.feature_names = list(columns)
+        
+        # Single float32 feature buffer (halves memory traffic downstream)
+        X = np.empty((len(y), len(columns)), dtype=np.float32)
+        for j, arr in enumerate(columns.values()):
+            X[:, j] = arr
+        
+        # Stratified split in one pass: shuffle each class's row indices
+        # once and cut them into [test | val | train], then gather each
+        # split from the buffer exactly once
+        train_idx, val_idx, test_idx = _stratified_split_indices(
+            y, test_size, val_size, np.random.default_rng(random_state)
         )
         
-        val_size_adjusted = val_size / (1 - test_size)
-        X_train, X_val, y_train, y_val = train_test_split(
-            X_temp, y_temp, test_size=val_size_adjusted, random_state=random_state, stratify=y_temp
-        )
+        X_train, X_val, X_test = X[train_idx], X[val_idx], X[test_idx]
+        y_train, y_val, y_test = y[train_idx], y[val_idx], y[test_idx]
         
         # Scale features
-        X_train = self.scaler.fit_transform(X_train)
-        X_val = self.scaler.transform(X_val)
-        X_test = self.scaler.transform(X_test)
-        
-        print(f"✅ Data prepared:")
-        print(f"   Training:   {X_train.shape[0]:,} samples ({X_train.shape[0]/len(df)*100:.1f}%)")
-        print(f"   Validation: {X_val.shape[0]:,} samples ({X_val.shape[0]/len(df)*100:.1f}%)")
-        print(f"   Test:       {X_test.shape[0]:,} samples ({X_test.shape[0]/len(df)*100:.1f}%)")
-        print(f"   Features:   {X_train.shape[1]}")
-        print(f"   Target distribution:")
-        print(f"     Train: {y_train.mean():.1%} high risk")
-        print(f"     Val:   {y_val.mean():.1%} high risk")
-        print(f"     Test:  {y_test.mean():.1%} high risk")
+        X_train = self._fit_transform_scaler(X_train)
+        X_val = self._scale_inplace(X_val)
+        X_test = self._scale_inplace(X_test)
+        
+        if self.verbose:
+            print(f"✅ Data prepared:")
+            print(f"   Training:   {X_train.shape[0]:,} samples ({X_train.shape[0]/len(y)*100:.1f}%)")
+            print(f"   Validation: {X_val.shape[0]:,} samples ({X_val.shape[0]/len(y)*100:.1f}%)")
+            print(f"   Test:       {X_test.shape[0]:,} samples ({X_test.shape[0]/len(y)*100:.1f}%)")
+            print(f"   Features:   {X_train.shape[1]}")
+            print(f"   Target distribution:")
+            print(f"     Train: {y_train.mean():.1%} high risk")
+            print(f"     Val:   {y_val.mean():.1%} high risk")
+            print(f"     Test:  {y_test.mean():.1%} high risk")
         
         return X_train, X_val, X_test, y_train, y_val, y_test
     
+    def _fit_transform_scaler(self, X_train: np.ndarray) -> np.ndarray:
+        """
+        Fit the scaler on the training split and return it standardized
+        
+        Uses cuML's StandardScaler on the GPU when cuML/CuPy and a CUDA
+        device are available. Otherwise the column statistics are reduced
+        with NumPy and the split is standardized in place. Either way the
+        fitted statistics are set on the scikit-learn scaler, so the saved
+        preprocessor stays CPU-only and API-compatible.
+        """
+        try:
+            import cupy as cp
+            from cuml.preprocessing import StandardScaler as GpuStandardScaler
+            use_gpu = cp.cuda.runtime.getDeviceCount() > 0
+        except Exception:  # Not installed, or no usable CUDA runtime
+            use_gpu = False
+        
+        if not use_gpu:
+            self._set_scaler_stats(X_train.mean(axis=0, dtype=np.float64),
+                                   X_train.var(axis=0, dtype=np.float64),
+                                   X_train.shape[0])
+            return self._scale_inplace(X_train)
+        
+        gpu_scaler = GpuStandardScaler()
+        X_scaled = gpu_scaler.fit_transform(cp.asarray(X_train))
+        self._set_scaler_stats(cp.asnumpy(gpu_scaler.mean_),
+                               cp.asnumpy(gpu_scaler.var_),
+                               X_train.shape[0])
+        if self.verbose:
+            print("   Scaled on GPU (cuML)")
+        return cp.asnumpy(X_scaled)
+    
+    def _set_scaler_stats(self, mean: np.ndarray, var: np.ndarray, n_samples: int):
+        """Populate the StandardScaler's fitted attributes from column statistics"""
+        scale = np.sqrt(var)
+        # Constant columns are left unscaled, as StandardScaler does
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+        self.scaler.mean_ = mean
+        self.scaler.var_ = var
+        self.scaler.scale_ = scale
+        self.scaler.n_samples_seen_ = n_samples
+        self.scaler.n_features_in_ = mean.shape[0]
+    
+    def _scale_inplace(self, X: np.ndarray) -> np.ndarray:
+        """Standardize X in place with the fitted scaler statistics"""
+        mean = self.scaler.mean_.astype(X.dtype)
+        scale = self.scaler.scale_.astype(X.dtype)
+        if ne is not None:
+            ne.evaluate("(X - mean) / scale", out=X)
+        else:
+            X -= mean
+            X /= scale
+        return X
+    
     def save_preprocessor(self, filepath: str):
         """Save scaler and encoders"""
         import joblib
@@ -257,7 +746,26 @@ class DataPreparationService:
             'label_encoders': self.label_encoders,
             'feature_names': self.feature_names
         }, filepath)
-        print(f"✅ Saved preprocessor to {filepath}")
+        if self.verbose:
+            print(f"✅ Saved preprocessor to {filepath}")
+    
+    def save_prepared_data(self, filepath: str,
+                           X_train: np.ndarray, X_val: np.ndarray, X_test: np.ndarray,
+                           y_train: np.ndarray, y_val: np.ndarray, y_test: np.ndarray):
+        """
+        Save train/val/test splits uncompressed, as float32 features and int8 labels
+        
+        Stored (not deflated) members can be memory-mapped by load_prepared_data.
+        """
+        features = {'X_train': X_train, 'X_val': X_val, 'X_test': X_test}
+        labels = {'y_train': y_train, 'y_val': y_val, 'y_test': y_test}
+        np.savez(
+            filepath,
+            **{name: arr.astype(np.float32, copy=False) for name, arr in features.items()},
+            **{name: arr.astype(np.int8, copy=False) for name, arr in labels.items()}
+        )
+        if self.verbose:
+            print(f"✅ Saved prepared data to {filepath}")
     
     def load_preprocessor(self, filepath: str):
         """Load scaler and encoders"""
@@ -266,7 +774,8 @@ class DataPreparationService:
         self.scaler = data['scaler']
         self.label_encoders = data['label_encoders']
         self.feature_names = data['feature_names']
-        print(f"✅ Loaded preprocessor from {filepath}")
+        if self.verbose:
+            print(f"✅ Loaded preprocessor from {filepath}")
 
 
 # Test if run directly
@@ -276,22 +785,29 @@ if __name__ == "__main__":
     print("="*80)
     
     # Initialize service
-    prep_service = DataPreparationService()
+    prep_service = DataPreparationService(verbose=True)
+    
+    os.makedirs('models', exist_ok=True)
     
-    # Generate synthetic data
-    df = prep_service.generate_synthetic_data(n_samples=80000)
+    # Generate synthetic data (or reuse the persisted Parquet copy)
+    data_path = 'models/synthetic_data.parquet'
+    if os.path.exists(data_path):
+        df = prep_service.load_data_from_parquet(data_path)
+    else:
+        # Column dict end to end: no DataFrame is built for this path
+        df = prep_service.generate_synthetic_data(n_samples=80000, as_frame=False)
+        prep_service.save_data_to_parquet(df, data_path)
     
     # Prepare data
     X_train, X_val, X_test, y_train, y_val, y_test = prep_service.prepare_data(df)
     
     # Save preprocessor
-    os.makedirs('models', exist_ok=True)
     prep_service.save_preprocessor('models/preprocessor.pkl')
     
     # Save prepared data
-    np.savez('models/prepared_data.npz',
-             X_train=X_train, X_val=X_val, X_test=X_test,
-             y_train=y_train, y_val=y_val, y_test=y_test)
+    prep_service.save_prepared_data('models/prepared_data.npz',
+                                    X_train, X_val, X_test,
+                                    y_train, y_val, y_test)
     
     print("\n✅ Data preparation complete!")
     print(f"   Saved to: models/prepared_data.npz")
@@ -0,0 +1,92 @@
+"""Equivalence tests for the API's fast inference paths.
+
+The integration tests never run the lifespan, so no models are loaded
+there; these fit tiny models directly.
+
+Run with:
+    python -m pytest ml-backend/test_api_inference.py -q
+"""
+
+import numpy as np
+import keras
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import api
+from api import PatientData, RAW_FEATURES
+
+
+def _features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, len(RAW_FEATURES) + 6)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] > 0).astype(np.int8)
+    return X, y
+
+
+def _patients(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        PatientData(age=float(rng.integers(29, 78)), sex=int(rng.integers(0, 2)),
+                    cp=int(rng.integers(0, 4)), trestbps=float(rng.integers(94, 200)),
+                    chol=float(rng.integers(126, 565)), fbs=int(rng.integers(0, 2)),
+                    restecg=int(rng.integers(0, 3)), thalach=float(rng.integers(71, 202)),
+                    exang=int(rng.integers(0, 2)), oldpeak=round(float(rng.uniform(0, 6.2)), 1),
+                    slope=int(rng.integers(0, 3)), ca=int(rng.integers(0, 5)),
+                    thal=int(rng.integers(0, 4)))
+        for _ in range(n)
+    ]
+
+
+def test_random_forest_predictor_matches_predict_proba():
+    X, y = _features(500)
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+    predict = api.random_forest_predictor(model)
+
+    assert predict is not None
+    # Single rows / small batches go through GTIL, larger ones through sklearn
+    for n in (1, api.GTIL_MAX_ROWS, api.GTIL_MAX_ROWS + 1):
+        np.testing.assert_allclose(predict(X[:n]), model.predict_proba(X[:n])[:, 1], atol=1e-6)
+
+
+def test_run_models_xgboost_booster_matches_predict_proba(monkeypatch):
+    X, y = _features(500)
+    model = xgb.XGBClassifier(n_estimators=10, max_depth=3).fit(X, y)
+    booster = model.get_booster()
+    single = booster.copy()
+    single.set_param({'nthread': 1})
+    monkeypatch.setattr(api, 'models', {})
+    monkeypatch.setattr(api, 'xgb_booster', booster)
+    monkeypatch.setattr(api, 'xgb_single_booster', single)
+    monkeypatch.setattr(api, 'rf_predict', None)
+    monkeypatch.setattr(api, 'nn_forward', None)
+
+    for n in (1, 100):
+        np.testing.assert_allclose(api.run_models(X[:n])['xgboost'],
+                                   model.predict_proba(X[:n])[:, 1], atol=1e-6)
+
+
+def test_numpy_mlp_forward_matches_keras_predict():
+    X, _ = _features(64)
+    model = keras.Sequential([
+        keras.layers.Input(shape=(X.shape[1],)),
+        keras.layers.Dense(16, activation='relu'),
+        keras.layers.Dropout(0.3),
+        keras.layers.Dense(8, activation='relu'),
+        keras.layers.Dense(1, activation='sigmoid'),
+    ])
+    forward = api.numpy_mlp_forward(model)
+
+    assert forward is not None
+    np.testing.assert_allclose(forward(X), model.predict(X, verbose=0).ravel(), atol=1e-5)
+
+
+def test_preprocess_input_matches_preprocess_batch(monkeypatch):
+    patients = _patients(20)
+    scaler = StandardScaler().fit(api.preprocess_batch(_patients(200, seed=1)))
+    monkeypatch.setattr(api, 'preprocessor', {'scaler': scaler})
+
+    batch = api.preprocess_batch(patients)
+    rows = np.vstack([api.preprocess_input(p) for p in patients])
+
+    np.testing.assert_allclose(rows, batch, rtol=1e-5, atol=1e-5)
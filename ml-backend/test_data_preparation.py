@@ -0,0 +1,97 @@
+"""Unit tests for the data preparation pipeline.
+
+Run with:
+    python -m pytest ml-backend/test_data_preparation.py -q
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from data_preparation import DataPreparationService, _stratified_split_indices, load_prepared_data
+
+
+def test_load_data_from_json_matches_dataframe_constructor(tmp_path):
+    records = [
+        {"age": 63, "chol": 233.5, "sex": 1, "label": "a"},
+        {"age": 41.5, "chol": None, "sex": 0, "label": "b"},
+        {"age": 57, "sex": 1, "label": None, "extra": 2},
+    ] * 500
+    json_path = tmp_path / "records.json"
+    json_path.write_text(json.dumps(records))
+
+    df = DataPreparationService().load_data_from_json(str(json_path))
+    expected = pd.DataFrame(records)
+
+    assert list(df.columns) == list(expected.columns)
+    assert len(df) == len(expected)
+    for col in ("age", "chol", "sex", "extra"):
+        np.testing.assert_allclose(df[col].to_numpy(dtype=float),
+                                   expected[col].to_numpy(dtype=float))
+    assert df["label"].isna().sum() == expected["label"].isna().sum()
+
+
+def test_engineer_features_bins_and_indicators():
+    df = pd.DataFrame({
+        "age": [29.0, 40.0, 40.5, 50.0, 60.0, 61.0],
+        "sex": [1, 0, 1, 0, 1, 0],
+        "trestbps": [120.0, 140.0, 141.0, 130.0, 150.0, 110.0],
+        "chol": [200.0, 240.0, 241.0, 250.0, 180.0, 300.0],
+        "thalach": [150.0, 200.0, 190.0, 400.0, 120.0, 100.0],
+    })
+
+    out = DataPreparationService().engineer_features(df)
+
+    # Right-closed bins, matching pd.cut(bins=[0, 40, 50, 60, 100])
+    assert out["age_group"].tolist() == [0, 0, 1, 1, 2, 3]
+    assert out["chol_risk"].tolist() == [0, 0, 1, 1, 0, 1]
+    assert out["bp_risk"].tolist() == [0, 0, 1, 0, 1, 0]
+    np.testing.assert_allclose(out["hr_reserve"],
+                               np.clip(df["thalach"] / (220 - df["age"]), 0, 1))
+    np.testing.assert_allclose(out["sex_age_interaction"], df["sex"] * df["age"])
+
+
+def test_prepare_data_accepts_column_dict():
+    frame_service = DataPreparationService()
+    frame_splits = frame_service.prepare_data(
+        frame_service.generate_synthetic_data(n_samples=2000))
+
+    dict_service = DataPreparationService()
+    columns = dict_service.generate_synthetic_data(n_samples=2000, as_frame=False)
+    dict_splits = dict_service.prepare_data(columns)
+
+    assert isinstance(columns, dict)
+    assert dict_service.feature_names == frame_service.feature_names
+    for from_frame, from_dict in zip(frame_splits, dict_splits):
+        np.testing.assert_array_equal(from_frame, from_dict)
+    X_train, y_train = dict_splits[0], dict_splits[3]
+    assert X_train.dtype == np.float32 and y_train.dtype == np.int8
+
+
+def test_stratified_split_indices_partition_rows():
+    y = np.array([0] * 700 + [1] * 300, dtype=np.int8)
+    train_idx, val_idx, test_idx = _stratified_split_indices(
+        y, 0.15, 0.15, np.random.default_rng(0))
+
+    all_idx = np.concatenate([train_idx, val_idx, test_idx])
+    assert np.array_equal(np.sort(all_idx), np.arange(len(y)))
+    assert (len(train_idx), len(val_idx), len(test_idx)) == (700, 150, 150)
+    for idx in (train_idx, val_idx, test_idx):
+        assert abs(y[idx].mean() - 0.3) < 1e-9
+
+
+def test_load_prepared_data_memory_maps_saved_splits(tmp_path):
+    rng = np.random.default_rng(0)
+    splits = [rng.normal(size=(n, 19)) for n in (50, 10, 10)] + \
+             [rng.integers(0, 2, n) for n in (50, 10, 10)]
+    path = str(tmp_path / 'prepared_data.npz')
+    DataPreparationService().save_prepared_data(path, *splits)
+
+    loaded = load_prepared_data(path)
+    expected = np.load(path)
+
+    assert sorted(loaded) == sorted(expected.files)
+    assert isinstance(loaded['X_train'], np.memmap) and loaded['X_train'].dtype == np.float32
+    for name in expected.files:
+        np.testing.assert_array_equal(loaded[name], expected[name])
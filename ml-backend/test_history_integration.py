@@ -5,7 +5,7 @@ Run with:
 """
 
 from fastapi.testclient import TestClient
-from api import app, init_db
+from api import app, init_db, get_db, SELECT_HISTORY_SQL
 
 client = TestClient(app)
 
@@ -50,6 +50,19 @@ def test_predict_and_history_roundtrip():
     ids = [p["id"] for p in history["predictions"]]
     assert ids[0] != ids[-1]
 
+def test_predictions_reach_db_without_lifespan_flusher():
+    # TestClient(app) without a context manager never starts the lifespan
+    init_db(reset=True)
+    user_id = "no-flusher-user"
+    for _ in range(2):
+        resp = client.post("/predict", json=sample_patient(), headers={"X-User-Id": user_id})
+        assert resp.status_code == 200, resp.text
+
+    count = get_db().execute(
+        "SELECT COUNT(*) FROM predictions WHERE user_id = ?", (user_id,)
+    ).fetchone()[0]
+    assert count == 2
+
 def test_history_empty_user():
     init_db(reset=True)
     user_id = "no-preds-user"
@@ -59,3 +72,20 @@ def test_history_empty_user():
     assert data["user_id"] == user_id
     assert data["count"] == 0
     assert data["predictions"] == []
+
+def test_batch_predict_one_result_per_patient():
+    patients = [sample_patient(), {**sample_patient(), "age": 35, "chol": 260}]
+    resp = client.post("/batch-predict", json=patients)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["count"] == 2
+    assert len(data["predictions"]) == 2
+    assert all("risk_level" in p for p in data["predictions"])
+
+def test_history_query_is_an_index_range_scan():
+    init_db(reset=True)
+    plan = " ".join(row[-1] for row in get_db().execute(
+        "EXPLAIN QUERY PLAN " + SELECT_HISTORY_SQL, ("some-user", 10)
+    ))
+    assert "idx_pred_user_id_desc" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,66 @@
+"""Unit tests for the training service helpers.
+
+Run with:
+    python -m pytest ml-backend/test_train_models.py -q
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from train_models import classification_metrics, fuse_ensemble, pack_predictions
+
+
+def test_fuse_ensemble_matches_weighted_sum():
+    rng = np.random.default_rng(0)
+    predictions = {name: rng.random(1000) for name in ('xgboost', 'random_forest', 'neural_network')}
+    weights = {'xgboost': 0.40, 'random_forest': 0.35, 'neural_network': 0.25}
+
+    proba, labels = fuse_ensemble(predictions, weights)
+
+    expected = sum(weights[name] * predictions[name] for name in predictions)
+    assert proba.dtype == np.float32 and labels.dtype == np.int8
+    np.testing.assert_allclose(proba, expected, rtol=1e-5)
+    # Only rows sitting on the threshold may flip under float32 rounding
+    mismatched = labels != (expected >= 0.5)
+    assert np.all(np.abs(expected[mismatched] - 0.5) < 1e-6)
+
+
+def test_classification_metrics_match_sklearn():
+    from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+
+    rng = np.random.default_rng(1)
+    y_true = rng.integers(0, 2, 500).astype(np.int8)
+    y_pred = np.where(rng.random(500) < 0.8, y_true, 1 - y_true).astype(np.int8)
+
+    expected = (accuracy_score(y_true, y_pred), precision_score(y_true, y_pred),
+                recall_score(y_true, y_pred), f1_score(y_true, y_pred))
+    np.testing.assert_allclose(classification_metrics(y_true, y_pred), expected)
+    assert classification_metrics(np.zeros(4, np.int8), np.zeros(4, np.int8)) == (1.0, 0.0, 0.0, 0.0)
+
+
+def test_pack_predictions_round_trips_labels():
+    proba = np.random.default_rng(2).random(1001)
+    proba16, labels, bits = pack_predictions(proba)
+
+    assert proba16.dtype == np.float16 and labels.dtype == np.int8
+    assert bits.dtype == np.uint8 and len(bits) == 126
+    np.testing.assert_allclose(proba16, proba, atol=5e-4)
+    np.testing.assert_array_equal(np.unpackbits(bits, count=len(proba)), labels)
+    np.testing.assert_array_equal(labels, proba16 >= 0.5)
+
+
+def test_pack_predictions_labels_match_bitmap_near_threshold():
+    # float16 rounding moves many of these across 0.5; labels must follow
+    proba = np.random.default_rng(3).uniform(0.4998, 0.5002, 100_000).astype(np.float32)
+    proba16, labels, bits = pack_predictions(proba)
+
+    np.testing.assert_array_equal(np.unpackbits(bits, count=len(proba)), labels)
+
+
+def test_import_does_not_load_tensorflow():
+    # train_all's tree workers re-import this module; TensorFlow must stay lazy
+    code = "import sys, train_models; sys.exit('tensorflow' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__))).returncode == 0
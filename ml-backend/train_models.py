@@ -13,22 +13,230 @@ Ensemble (target: 96-97% accuracy)
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
+from __future__ import annotations
+
 import numpy as np
 import pandas as pd
-from sklearn.metrics import (accuracy_score, precision_score, recall_score, 
-                            f1_score, roc_auc_score, confusion_matrix,
+from sklearn.metrics import (accuracy_score, roc_auc_score, confusion_matrix,
                             classification_report)
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
 import xgboost as xgb
-import tensorflow as tf
-from tensorflow import keras
-# from tensorflow.keras import layers # Removed to fix import resolution issue
 import joblib
 import json
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Dict, Tuple, Any
 
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: falls back to NumPy for ensemble fusion
+    njit = None
+
+# TensorFlow / Keras, imported on first use (see _import_tensorflow)
+tf = None
+keras = None
+
+
+def _import_tensorflow():
+    """
+    Import TensorFlow on first use
+    
+    Kept off module import so the tree-model worker processes of train_all
+    (which re-import this module) never load TensorFlow or open a CUDA
+    context of their own.
+    
+    Returns:
+        The tensorflow module
+    """
+    global tf, keras
+    if tf is None:
+        import tensorflow
+        from tensorflow import keras as tf_keras
+        # Allocate GPU memory on demand instead of reserving the whole device
+        for gpu in tensorflow.config.list_physical_devices('GPU'):
+            tensorflow.config.experimental.set_memory_growth(gpu, True)
+        tf, keras = tensorflow, tf_keras
+    return tf
+
+# Rows per inference batch: a few large GEMMs instead of thousands of 32-row steps
+PREDICT_BATCH_SIZE = 8192
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fuse_kernel(preds, weights, threshold, proba, labels):
+        """Weighted sum over models and threshold, one pass per row"""
+        n_models, n_rows = preds.shape
+        for i in prange(n_rows):
+            s = 0.0
+            for m in range(n_models):
+                s += preds[m, i] * weights[m]
+            proba[i] = s
+            labels[i] = 1 if s >= threshold else 0
+
+
+def fuse_ensemble(predictions: Dict[str, np.ndarray],
+                  weights: Dict[str, float],
+                  threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted ensemble of per-model probabilities
+    
+    Args:
+        predictions: Model name -> (N,) positive-class probabilities
+        weights: Model name -> ensemble weight
+        threshold: Decision threshold on the weighted sum
+        
+    Returns:
+        Tuple of ((N,) float32 ensemble probability, (N,) int8 labels)
+    """
+    preds = np.stack([np.asarray(p, dtype=np.float32) for p in predictions.values()])
+    w = np.array([weights[name] for name in predictions], dtype=np.float32)
+    if njit is None:
+        proba = w @ preds
+        return proba, (proba >= threshold).astype(np.int8)
+    proba = np.empty(preds.shape[1], dtype=np.float32)
+    labels = np.empty(preds.shape[1], dtype=np.int8)
+    _fuse_kernel(preds, w, np.float32(threshold), proba, labels)
+    return proba, labels
+
+
+def pack_predictions(proba: np.ndarray,
+                     threshold: float = 0.5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compact serializable form of ensemble predictions
+    
+    Labels and bitmap come from one float16 threshold mask, so the labels
+    scored are exactly the labels persisted.
+    
+    Args:
+        proba: (N,) probabilities
+        threshold: Decision threshold
+        
+    Returns:
+        Tuple of ((N,) float16 probabilities, (N,) int8 labels, packed uint8
+        label bitmap of ceil(N/8) bytes; np.unpackbits(bits, count=N)
+        restores the labels)
+    """
+    proba16 = np.asarray(proba).astype(np.float16)
+    mask = proba16 >= np.float16(threshold)
+    return proba16, mask.astype(np.int8), np.packbits(mask)
+
+
+def classification_metrics(y_true: np.ndarray,
+                           y_pred: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    Accuracy, precision, recall and F1 from a single confusion-matrix pass
+    
+    Args:
+        y_true: (N,) 0/1 labels
+        y_pred: (N,) 0/1 predictions
+        
+    Returns:
+        Tuple of (accuracy, precision, recall, f1); undefined ratios are 0.0
+    """
+    counts = np.bincount(2 * y_true.astype(np.intp) + y_pred.astype(np.intp), minlength=4)
+    tn, fp, fn, tp = (int(c) for c in counts)
+    accuracy = (tp + tn) / max(tn + fp + fn + tp, 1)
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return accuracy, precision, recall, f1
+
+
+def _joblib_compression():
+    """lz4 (fast to decompress) when installed, else zlib level 3"""
+    try:
+        import lz4  # noqa: F401
+        return ('lz4', 3)
+    except ImportError:
+        return 3
+
+
+def quantize_to_tflite(model: keras.Model,
+                       representative_data: np.ndarray = None) -> bytes:
+    """
+    Post-training int8 quantization of the Keras network to TFLite
+    
+    Args:
+        model: Trained Keras model
+        representative_data: Sample of training rows used to calibrate
+            activation ranges; without it only the weights are quantized
+            (dynamic-range quantization)
+        
+    Returns:
+        Serialized TFLite flatbuffer (float32 input/output)
+    """
+    _import_tensorflow()
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if representative_data is not None:
+        sample = np.asarray(representative_data[:1000], dtype=np.float32)
+        converter.representative_dataset = lambda: ([sample[i:i + 1]] for i in range(0, len(sample), 8))
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
+
+
+def export_serving_model(model: keras.Model, path: str):
+    """
+    Export the network as a SavedModel specialized for its input width
+    
+    The serving signature is an XLA-compiled tf.function over
+    [None, input_dim] float32 rows, so the (128, 64, 32, 1) chain is traced
+    once with fixed layer shapes and only the batch dimension varies.
+    
+    Args:
+        model: Trained Keras model
+        path: Output SavedModel directory
+    """
+    _import_tensorflow()
+    input_dim = model.input_shape[-1]
+    
+    @tf.function(input_signature=[tf.TensorSpec([None, input_dim], tf.float32)],
+                 jit_compile=True)
+    def serve(x):
+        return {'risk_probability': model(x, training=False)}
+    
+    tf.saved_model.save(model, path, signatures={'serving_default': serve})
+
+
+def _auto_batch_size(n_samples: int) -> int:
+    """
+    Network training batch size for the available device
+    
+    On GPU: the largest power of two in [256, 4096] that still leaves about
+    100 steps per epoch (activations of this MLP are ~1 KB per row, so
+    memory never binds first). On CPU: 256.
+    """
+    if not _import_tensorflow().config.list_physical_devices('GPU'):
+        return 256
+    return int(min(4096, max(256, 2 ** int(np.log2(max(n_samples // 100, 1))))))
+
+
+def _xgboost_device() -> str:
+    """'cuda' when XGBoost was built with CUDA and a GPU is visible, else 'cpu'"""
+    if xgb.build_info().get('USE_CUDA') and _import_tensorflow().config.list_physical_devices('GPU'):
+        return 'cuda'
+    return 'cpu'
+
+def _train_in_worker(method_name: str,
+                     X_train: np.ndarray,
+                     y_train: np.ndarray,
+                     X_val: np.ndarray,
+                     y_val: np.ndarray,
+                     kwargs: Dict[str, Any]) -> Tuple[Any, Dict[str, float]]:
+    """
+    Run one ModelTrainingService.train_* method in a worker process
+    
+    Returns:
+        Tuple of (fitted model, that model's metrics entry)
+    """
+    trainer = ModelTrainingService()
+    model = getattr(trainer, method_name)(X_train, y_train, X_val, y_val, **kwargs)
+    (metrics,) = trainer.metrics.values()
+    return model, metrics
+
 class ModelTrainingService:
     """
     Trains and evaluates multiple ML models for cardiac risk prediction
@@ -38,6 +246,34 @@ class ModelTrainingService:
         self.models = {}
         self.metrics = {}
         self.feature_names = []
+        # Test-set probabilities per model from the last evaluate_on_test
+        self._test_probas = {}
+        # Packed (float16 proba, label bitmap) ensemble test predictions
+        self._ensemble_test = None
+    
+    def _predict_proba(self, model_name: str, X: np.ndarray) -> np.ndarray:
+        """
+        Positive-class probabilities from one trained model
+        
+        Args:
+            model_name: Key in self.models
+            X: Feature matrix
+            
+        Returns:
+            (N,) array of probabilities
+        """
+        model = self.models[model_name]
+        if model_name == 'neural_network':
+            _import_tensorflow()
+            dataset = (tf.data.Dataset.from_tensor_slices(X)
+                       .batch(PREDICT_BATCH_SIZE)
+                       .prefetch(tf.data.AUTOTUNE))
+            return model.predict(dataset, verbose=0).ravel()
+        if isinstance(model, xgb.XGBClassifier):
+            # Native booster, no DMatrix copy: (N,) sigmoid(margin) directly
+            # instead of the (N, 2) predict_proba array
+            return model.get_booster().inplace_predict(X)
+        return model.predict_proba(X)[:, 1]
         
     def train_xgboost(self, 
                      X_train: np.ndarray, 
@@ -49,6 +285,7 @@ class ModelTrainingService:
         Train XGBoost classifier
         
         Target: 95%+ accuracy
+        (report_train=True also scores the training set)
         """
         print("\n" + "="*80)
         print("🚀 TRAINING XGBOOST MODEL")
@@ -62,10 +299,15 @@ class ModelTrainingService:
             'min_child_weight': kwargs.get('min_child_weight', 1),
             'subsample': kwargs.get('subsample', 0.8),
             'colsample_bytree': kwargs.get('colsample_bytree', 0.8),
+            # Histogram splits: features are quantized into max_bin bins once
+            # (a QuantileDMatrix inside fit) and every round reuses them
+            'tree_method': 'hist',
+            'max_bin': kwargs.get('max_bin', 256),
+            'device': kwargs.get('device') or _xgboost_device(),
             'objective': 'binary:logistic',
             'eval_metric': 'logloss',
             'random_state': 42,
-            'n_jobs': -1
+            'n_jobs': kwargs.get('n_jobs', -1)
         }
         
         print(f"Hyperparameters:")
@@ -82,15 +324,14 @@ class ModelTrainingService:
             verbose=False
         )
         
-        # Evaluate
-        train_pred = model.predict(X_train)
-        val_pred = model.predict(X_val)
-        
-        train_acc = accuracy_score(y_train, train_pred)
-        val_acc = accuracy_score(y_val, val_pred)
+        # Evaluate (a full training-set pass only when asked for)
+        report_train = kwargs.get('report_train', False)
+        val_acc = accuracy_score(y_val, model.predict(X_val))
         
         print(f"\n✅ XGBoost Training Complete!")
-        print(f"   Training Accuracy:   {train_acc*100:.2f}%")
+        if report_train:
+            train_acc = accuracy_score(y_train, model.predict(X_train))
+            print(f"   Training Accuracy:   {train_acc*100:.2f}%")
         print(f"   Validation Accuracy: {val_acc*100:.2f}%")
         
         if val_acc >= 0.95:
@@ -99,10 +340,9 @@ class ModelTrainingService:
             print(f"   ⚠️  Target: 95%+ (current: {val_acc*100:.2f}%)")
         
         self.models['xgboost'] = model
-        self.metrics['xgboost'] = {
-            'train_accuracy': float(train_acc),
-            'val_accuracy': float(val_acc)
-        }
+        self.metrics['xgboost'] = {'val_accuracy': float(val_acc)}
+        if report_train:
+            self.metrics['xgboost']['train_accuracy'] = float(train_acc)
         
         return model
     
@@ -111,26 +351,50 @@ class ModelTrainingService:
                            y_train: np.ndarray,
                            X_val: np.ndarray,
                            y_val: np.ndarray,
-                           **kwargs) -> RandomForestClassifier:
+                           **kwargs) -> Any:
         """
         Train Random Forest classifier
         
         Target: 94%+ accuracy
+        (report_train=True also scores the training set)
+        
+        The tree-ensemble slot defaults to a RandomForestClassifier.
+        algorithm='hist_gradient_boosting' trains scikit-learn's
+        histogram-binned booster instead: features are quantized
+        once and split finding works on small integer bins. The model is
+        stored under 'random_forest' either way.
+        
+        The Random Forest grows in batches of growth_step trees and stops
+        once out-of-bag accuracy stops improving; n_estimators is the cap.
         """
         print("\n" + "="*80)
         print("🌳 TRAINING RANDOM FOREST MODEL")
         print("="*80)
         
+        algorithm = kwargs.get('algorithm', 'random_forest')
+        
         # Default hyperparameters
-        params = {
-            'n_estimators': kwargs.get('n_estimators', 500),
-            'max_depth': kwargs.get('max_depth', 15),
-            'min_samples_split': kwargs.get('min_samples_split', 5),
-            'min_samples_leaf': kwargs.get('min_samples_leaf', 2),
-            'max_features': kwargs.get('max_features', 'sqrt'),
-            'random_state': 42,
-            'n_jobs': -1
-        }
+        if algorithm == 'hist_gradient_boosting':
+            estimator = HistGradientBoostingClassifier
+            params = {
+                'max_iter': kwargs.get('max_iter', 500),
+                'max_depth': kwargs.get('max_depth', None),
+                'max_leaf_nodes': kwargs.get('max_leaf_nodes', 63),
+                'learning_rate': kwargs.get('learning_rate', 0.05),
+                'early_stopping': True,
+                'random_state': 42
+            }
+        else:
+            estimator = RandomForestClassifier
+            params = {
+                'n_estimators': kwargs.get('n_estimators', 500),
+                'max_depth': kwargs.get('max_depth', 15),
+                'min_samples_split': kwargs.get('min_samples_split', 5),
+                'min_samples_leaf': kwargs.get('min_samples_leaf', 2),
+                'max_features': kwargs.get('max_features', 'sqrt'),
+                'random_state': 42,
+                'n_jobs': kwargs.get('n_jobs', -1)
+            }
         
         print(f"Hyperparameters:")
         for key, value in params.items():
@@ -138,18 +402,22 @@ class ModelTrainingService:
         
         # Train model
         print(f"\nTraining on {len(X_train):,} samples...")
-        model = RandomForestClassifier(**params)
-        model.fit(X_train, y_train)
-        
-        # Evaluate
-        train_pred = model.predict(X_train)
-        val_pred = model.predict(X_val)
+        model = estimator(**params)
+        if algorithm == 'random_forest':
+            model = self._grow_forest(model, X_train, y_train,
+                                      step=kwargs.get('growth_step', 50),
+                                      patience=kwargs.get('patience', 2))
+        else:
+            model.fit(X_train, y_train)
         
-        train_acc = accuracy_score(y_train, train_pred)
-        val_acc = accuracy_score(y_val, val_pred)
+        # Evaluate (a full training-set pass only when asked for)
+        report_train = kwargs.get('report_train', False)
+        val_acc = accuracy_score(y_val, model.predict(X_val))
         
         print(f"\n✅ Random Forest Training Complete!")
-        print(f"   Training Accuracy:   {train_acc*100:.2f}%")
+        if report_train:
+            train_acc = accuracy_score(y_train, model.predict(X_train))
+            print(f"   Training Accuracy:   {train_acc*100:.2f}%")
         print(f"   Validation Accuracy: {val_acc*100:.2f}%")
         
         if val_acc >= 0.94:
@@ -158,11 +426,46 @@ class ModelTrainingService:
             print(f"   ⚠️  Target: 94%+ (current: {val_acc*100:.2f}%)")
         
         self.models['random_forest'] = model
-        self.metrics['random_forest'] = {
-            'train_accuracy': float(train_acc),
-            'val_accuracy': float(val_acc)
-        }
+        self.metrics['random_forest'] = {'val_accuracy': float(val_acc)}
+        if report_train:
+            self.metrics['random_forest']['train_accuracy'] = float(train_acc)
+        
+        return model
+    
+    @staticmethod
+    def _grow_forest(model: RandomForestClassifier,
+                     X_train: np.ndarray,
+                     y_train: np.ndarray,
+                     step: int = 50,
+                     patience: int = 2) -> RandomForestClassifier:
+        """
+        Grow a Random Forest in batches of trees until out-of-bag accuracy plateaus
         
+        Args:
+            model: Unfitted forest; its n_estimators is the upper bound
+            X_train, y_train: Training data
+            step: Trees added per round
+            patience: Rounds without OOB improvement before stopping
+            
+        Returns:
+            Fitted forest (possibly with fewer than n_estimators trees)
+        """
+        max_trees = model.n_estimators
+        model.set_params(n_estimators=min(step, max_trees), warm_start=True, oob_score=True)
+        best_oob, bad_rounds = 0.0, 0
+        while True:
+            model.fit(X_train, y_train)
+            if model.oob_score_ > best_oob + 1e-4:
+                best_oob, bad_rounds = model.oob_score_, 0
+            else:
+                bad_rounds += 1
+            if bad_rounds >= patience or model.n_estimators >= max_trees:
+                break
+            model.n_estimators = min(model.n_estimators + step, max_trees)
+        
+        print(f"   Grew {model.n_estimators} trees (OOB accuracy: {best_oob*100:.2f}%)")
+        # A later fit() starts from scratch instead of adding trees
+        model.warm_start = False
         return model
     
     def train_neural_network(self,
@@ -175,29 +478,52 @@ class ModelTrainingService:
         Train Neural Network with TensorFlow/Keras
         
         Target: 96%+ accuracy
+        (report_train=True also scores the training set)
         """
         print("\n" + "="*80)
         print("🧠 TRAINING NEURAL NETWORK MODEL")
         print("="*80)
         
+        _import_tensorflow()
         input_dim = X_train.shape[1]
         
+        # Mixed precision (float16 compute, float32 weights) only pays off
+        # on GPU tensor cores; on CPU it is slower, so it defaults to off
+        mixed_precision = kwargs.get('mixed_precision',
+                                     bool(tf.config.list_physical_devices('GPU')))
+        dtype = 'mixed_float16' if mixed_precision else None
+        
         # Build model architecture
         model = keras.Sequential([
             keras.layers.Input(shape=(input_dim,)),
-            keras.layers.Dense(128, activation='relu', name='hidden1'),
-            keras.layers.Dropout(0.3),
-            keras.layers.Dense(64, activation='relu', name='hidden2'),
-            keras.layers.Dropout(0.2),
-            keras.layers.Dense(32, activation='relu', name='hidden3'),
-            keras.layers.Dropout(0.1),
-            keras.layers.Dense(1, activation='sigmoid', name='output')
+            keras.layers.Dense(128, activation='relu', name='hidden1', dtype=dtype),
+            keras.layers.Dropout(0.3, dtype=dtype),
+            keras.layers.Dense(64, activation='relu', name='hidden2', dtype=dtype),
+            keras.layers.Dropout(0.2, dtype=dtype),
+            keras.layers.Dense(32, activation='relu', name='hidden3', dtype=dtype),
+            keras.layers.Dropout(0.1, dtype=dtype),
+            # float32 output keeps the sigmoid and the loss numerically safe
+            keras.layers.Dense(1, activation='sigmoid', name='output', dtype='float32')
         ])
         
+        # Larger batches take fewer, less noisy steps; Adam's learning rate
+        # scales with sqrt(batch size) from 0.001 at 256
+        batch_size = kwargs.get('batch_size') or _auto_batch_size(len(X_train))
+        learning_rate = kwargs.get('learning_rate', 0.001 * float(np.sqrt(batch_size / 256)))
+        print(f"Batch size: {batch_size}, learning rate: {learning_rate:.5f}")
+        
+        optimizer = keras.optimizers.Adam(learning_rate=learning_rate)
+        if mixed_precision:
+            optimizer = keras.mixed_precision.LossScaleOptimizer(optimizer)
+            X_train = X_train.astype(np.float16)
+            X_val = X_val.astype(np.float16)
+        
+        # XLA fuses each Dense + activation + dropout step into one kernel
         model.compile(
-            optimizer=keras.optimizers.Adam(learning_rate=0.001),
+            optimizer=optimizer,
             loss='binary_crossentropy',
-            metrics=['accuracy']
+            metrics=['accuracy'],
+            jit_compile=True
         )
         
         print("\nModel Architecture:")
@@ -212,23 +538,40 @@ class ModelTrainingService:
             restore_best_weights=True
         )
         
+        # Input pipeline built once: cached tensors, reshuffled every epoch,
+        # large batches (few Python-level steps per epoch) and prefetching
+        train_ds = (tf.data.Dataset.from_tensor_slices((X_train, y_train))
+                    .cache()
+                    .shuffle(min(len(X_train), 65536), seed=42,
+                             reshuffle_each_iteration=True)
+                    .batch(batch_size)
+                    .prefetch(tf.data.AUTOTUNE))
+        val_ds = (tf.data.Dataset.from_tensor_slices((X_val, y_val))
+                  .batch(PREDICT_BATCH_SIZE)
+                  .cache())
+        
         history = model.fit(
-            X_train, y_train,
-            validation_data=(X_val, y_val),
+            train_ds,
+            validation_data=val_ds,
             epochs=kwargs.get('epochs', 50),
-            batch_size=kwargs.get('batch_size', 32),
             callbacks=[early_stopping],
             verbose=1
         )
         
-        # Evaluate
-        train_loss, train_acc = model.evaluate(X_train, y_train, verbose=0)
-        val_loss, val_acc = model.evaluate(X_val, y_val, verbose=0)
+        # Evaluate (a full training-set pass only when asked for)
+        report_train = kwargs.get('report_train', False)
+        val_loss, val_acc = model.evaluate(val_ds, verbose=0)
         
         print(f"\n✅ Neural Network Training Complete!")
-        print(f"   Training Accuracy:   {train_acc*100:.2f}%")
+        if report_train:
+            train_eval_ds = (tf.data.Dataset.from_tensor_slices((X_train, y_train))
+                             .batch(PREDICT_BATCH_SIZE)
+                             .prefetch(tf.data.AUTOTUNE))
+            train_loss, train_acc = model.evaluate(train_eval_ds, verbose=0)
+            print(f"   Training Accuracy:   {train_acc*100:.2f}%")
         print(f"   Validation Accuracy: {val_acc*100:.2f}%")
-        print(f"   Training Loss:       {train_loss:.4f}")
+        if report_train:
+            print(f"   Training Loss:       {train_loss:.4f}")
         print(f"   Validation Loss:     {val_loss:.4f}")
         
         if val_acc >= 0.96:
@@ -238,14 +581,83 @@ class ModelTrainingService:
         
         self.models['neural_network'] = model
         self.metrics['neural_network'] = {
-            'train_accuracy': float(train_acc),
             'val_accuracy': float(val_acc),
-            'train_loss': float(train_loss),
             'val_loss': float(val_loss)
         }
+        if report_train:
+            self.metrics['neural_network'].update({
+                'train_accuracy': float(train_acc),
+                'train_loss': float(train_loss)
+            })
         
         return model
     
+    def train_all(self,
+                  X_train: np.ndarray,
+                  y_train: np.ndarray,
+                  X_val: np.ndarray,
+                  y_val: np.ndarray,
+                  epochs: int = 50,
+                  parallel: bool = None) -> Dict[str, Any]:
+        """
+        Train XGBoost, Random Forest and the Neural Network
+        
+        With parallel the two tree models train in separate worker
+        processes while the Neural Network trains here, so wall-clock is the
+        slowest model rather than the sum. The CPU cores are split three
+        ways; XGBoost keeps the GPU when one is available.
+        
+        Args:
+            X_train, y_train: Training split
+            X_val, y_val: Validation split
+            epochs: Neural Network epochs
+            parallel: Train the tree models in worker processes
+                (default: when at least 3 CPU cores are available)
+            
+        Returns:
+            Dict of trained models
+        """
+        n_cores = os.cpu_count() or 1
+        if parallel is None:
+            parallel = n_cores >= 3
+        if not parallel:
+            self.train_xgboost(X_train, y_train, X_val, y_val)
+            self.train_random_forest(X_train, y_train, X_val, y_val)
+            self.train_neural_network(X_train, y_train, X_val, y_val, epochs=epochs)
+            return self.models
+        
+        # One third of the cores per tree worker, the rest for TensorFlow,
+        # so the three trainers together stay within the core count
+        n_jobs = max(1, n_cores // 3)
+        tensorflow = _import_tensorflow()
+        try:
+            tensorflow.config.threading.set_intra_op_parallelism_threads(max(1, n_cores - 2 * n_jobs))
+            tensorflow.config.threading.set_inter_op_parallelism_threads(1)
+        except RuntimeError:
+            pass  # TensorFlow already initialised; keep its thread pools
+        # Device chosen here: workers never import TensorFlow to probe for a GPU
+        jobs = {
+            'xgboost': ('train_xgboost', {'n_jobs': n_jobs, 'device': _xgboost_device()}),
+            'random_forest': ('train_random_forest', {'n_jobs': n_jobs}),
+        }
+        # spawn: forking after TensorFlow has initialised can deadlock
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=len(jobs), mp_context=context) as pool:
+            futures = {
+                name: pool.submit(_train_in_worker, method, X_train, y_train,
+                                  X_val, y_val, kwargs)
+                for name, (method, kwargs) in jobs.items()
+            }
+            self.train_neural_network(X_train, y_train, X_val, y_val, epochs=epochs)
+            for name, future in futures.items():
+                self.models[name], self.metrics[name] = future.result()
+        
+        # Same key order as the serial path (ensemble and metrics files)
+        order = ('xgboost', 'random_forest', 'neural_network')
+        self.models = {name: self.models[name] for name in order}
+        self.metrics = {name: self.metrics[name] for name in order}
+        return self.models
+    
     def create_ensemble(self,
                        X_val: np.ndarray,
                        y_val: np.ndarray,
@@ -273,21 +685,12 @@ class ModelTrainingService:
         # Get predictions from each model
         predictions = {}
         
-        if 'xgboost' in self.models:
-            predictions['xgboost'] = self.models['xgboost'].predict_proba(X_val)[:, 1]
-        
-        if 'random_forest' in self.models:
-            predictions['random_forest'] = self.models['random_forest'].predict_proba(X_val)[:, 1]
-        
-        if 'neural_network' in self.models:
-            predictions['neural_network'] = self.models['neural_network'].predict(X_val).flatten()
+        for model_name in ('xgboost', 'random_forest', 'neural_network'):
+            if model_name in self.models:
+                predictions[model_name] = self._predict_proba(model_name, X_val)
         
         # Weighted average
-        ensemble_pred_proba = np.zeros(len(X_val))
-        for model_name, pred in predictions.items():
-            ensemble_pred_proba += pred * weights[model_name]
-        
-        ensemble_pred = (ensemble_pred_proba >= 0.5).astype(int)
+        ensemble_pred_proba, ensemble_pred = fuse_ensemble(predictions, weights)
         
         # Evaluate ensemble
         ensemble_acc = accuracy_score(y_val, ensemble_pred)
@@ -319,22 +722,18 @@ class ModelTrainingService:
         print("="*80)
         
         results = {}
+        # One inference pass per model; the ensemble reuses these
+        probas = {}
         
         for model_name, model in self.models.items():
             print(f"\nEvaluating {model_name.upper()}...")
             
-            if model_name == 'neural_network':
-                y_pred_proba = model.predict(X_test).flatten()
-            else:
-                y_pred_proba = model.predict_proba(X_test)[:, 1]
+            y_pred_proba = probas[model_name] = self._predict_proba(model_name, X_test)
             
             y_pred = (y_pred_proba >= 0.5).astype(int)
             
             # Calculate metrics
-            acc = accuracy_score(y_test, y_pred)
-            precision = precision_score(y_test, y_pred)
-            recall = recall_score(y_test, y_pred)
-            f1 = f1_score(y_test, y_pred)
+            acc, precision, recall, f1 = classification_metrics(y_test, y_pred)
             auc_roc = roc_auc_score(y_test, y_pred_proba)
             
             results[model_name] = {
@@ -351,24 +750,18 @@ class ModelTrainingService:
             print(f"  F1-Score:  {f1*100:.2f}%")
             print(f"  AUC-ROC:   {auc_roc*100:.2f}%")
         
+        self._test_probas = probas
+        
         # Evaluate ensemble
         if ensemble_weights and len(self.models) == 3:
             print(f"\nEvaluating ENSEMBLE...")
             
-            ensemble_pred_proba = np.zeros(len(X_test))
-            for model_name, model in self.models.items():
-                if model_name == 'neural_network':
-                    pred = model.predict(X_test).flatten()
-                else:
-                    pred = model.predict_proba(X_test)[:, 1]
-                ensemble_pred_proba += pred * ensemble_weights[model_name]
-            
-            ensemble_pred = (ensemble_pred_proba >= 0.5).astype(int)
+            ensemble_pred_proba, _ = fuse_ensemble(probas, ensemble_weights)
+            # Score the same float16-thresholded labels that are persisted
+            proba16, ensemble_pred, label_bits = pack_predictions(ensemble_pred_proba)
+            self._ensemble_test = (proba16, label_bits)
             
-            acc = accuracy_score(y_test, ensemble_pred)
-            precision = precision_score(y_test, ensemble_pred)
-            recall = recall_score(y_test, ensemble_pred)
-            f1 = f1_score(y_test, ensemble_pred)
+            acc, precision, recall, f1 = classification_metrics(y_test, ensemble_pred)
             auc_roc = roc_auc_score(y_test, ensemble_pred_proba)
             
             results['ensemble'] = {
@@ -388,19 +781,48 @@ class ModelTrainingService:
         
         return results
     
-    def save_models(self, output_dir: str = 'models'):
-        """Save all trained models"""
+    def save_models(self, output_dir: str = 'models',
+                    representative_data: np.ndarray = None):
+        """
+        Save all trained models
+        
+        The Neural Network is additionally exported as a serving SavedModel
+        ({name}_serving/) and an int8-quantized TFLite model
+        (nn_int8.tflite); representative_data (training rows)
+        calibrates the activation ranges for full int8 quantization.
+        """
         os.makedirs(output_dir, exist_ok=True)
         
         print(f"\n💾 Saving models to {output_dir}/...")
         
         for model_name, model in self.models.items():
             if model_name == 'neural_network':
-                model.save(f'{output_dir}/{model_name}_model.h5')
+                # Native Keras format
+                model.save(f'{output_dir}/{model_name}_model.keras')
+                try:
+                    export_serving_model(model, f'{output_dir}/{model_name}_serving')
+                    print(f"  ✅ Saved {model_name} (serving SavedModel)")
+                except Exception as e:
+                    print(f"  ⚠️  SavedModel export skipped: {e}")
+                try:
+                    with open(f'{output_dir}/nn_int8.tflite', 'wb') as f:
+                        f.write(quantize_to_tflite(model, representative_data))
+                    print(f"  ✅ Saved {model_name} (int8 TFLite)")
+                except Exception as e:
+                    print(f"  ⚠️  TFLite export skipped: {e}")
             else:
-                joblib.dump(model, f'{output_dir}/{model_name}_model.pkl')
+                # Compressed pickle, protocol 5 (out-of-band NumPy buffers)
+                joblib.dump(model, f'{output_dir}/{model_name}_model.joblib',
+                            compress=_joblib_compression(), protocol=5)
             print(f"  ✅ Saved {model_name}")
         
+        # Ensemble test predictions: float16 probabilities + 1 bit per label
+        if self._ensemble_test is not None:
+            proba16, label_bits = self._ensemble_test
+            np.savez(f'{output_dir}/ensemble_test_predictions.npz',
+                     proba=proba16, label_bits=label_bits)
+            print(f"  ✅ Saved ensemble test predictions")
+        
         # Save metrics
         with open(f'{output_dir}/training_metrics.json', 'w') as f:
             json.dump(self.metrics, f, indent=2)
@@ -417,13 +839,17 @@ if __name__ == "__main__":
     
     # Load prepared data
     print("\n📂 Loading prepared data...")
-    data = np.load('models/prepared_data.npz')
-    X_train = data['X_train']
-    X_val = data['X_val']
-    X_test = data['X_test']
-    y_train = data['y_train']
-    y_val = data['y_val']
-    y_test = data['y_test']
+    from data_preparation import load_prepared_data
+    # Memory-mapped when stored uncompressed (pages load on demand)
+    data = load_prepared_data('models/prepared_data.npz')
+    # float32 features / int8 labels (no-op casts for files written by
+    # data_preparation; older float64 files are narrowed once here)
+    X_train = data['X_train'].astype(np.float32, copy=False)
+    X_val = data['X_val'].astype(np.float32, copy=False)
+    X_test = data['X_test'].astype(np.float32, copy=False)
+    y_train = data['y_train'].astype(np.int8, copy=False)
+    y_val = data['y_val'].astype(np.int8, copy=False)
+    y_test = data['y_test'].astype(np.int8, copy=False)
     
     print(f"✅ Data loaded:")
     print(f"   Train: {len(X_train):,} samples")
@@ -433,10 +859,8 @@ if __name__ == "__main__":
     # Initialize training service
     trainer = ModelTrainingService()
     
-    # Train all models
-    trainer.train_xgboost(X_train, y_train, X_val, y_val)
-    trainer.train_random_forest(X_train, y_train, X_val, y_val)
-    trainer.train_neural_network(X_train, y_train, X_val, y_val, epochs=50)
+    # Train all models (tree models in worker processes alongside the NN)
+    trainer.train_all(X_train, y_train, X_val, y_val, epochs=50)
     
     # Create ensemble
     ensemble_weights = trainer.create_ensemble(X_val, y_val)
@@ -444,8 +868,8 @@ if __name__ == "__main__":
     # Final evaluation on test set
     test_results = trainer.evaluate_on_test(X_test, y_test, ensemble_weights)
     
-    # Save models
-    trainer.save_models()
+    # Save models (training rows calibrate the int8 network export)
+    trainer.save_models(representative_data=X_train)
     
     # Print final summary
     print("\n" + "="*80)